@@ -1,21 +1,32 @@
 import os
 import json
 import logging
-from openai import OpenAI
 
 # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
 # do not change this unless explicitly requested by the user
 
-# Initialize OpenAI client
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    logging.warning("OPENAI_API_KEY not set - AI features will be disabled")
-    openai_client = None
-else:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+# The OpenAI SDK is slow to import, so the client is built on first use
+# instead of when this module is imported
+_openai_client = None
+_openai_client_ready = False
+
+def get_openai_client():
+    """Return the shared OpenAI client, creating it on first call"""
+    global _openai_client, _openai_client_ready
+    if not _openai_client_ready:
+        if not OPENAI_API_KEY:
+            logging.warning("OPENAI_API_KEY not set - AI features will be disabled")
+        else:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        _openai_client_ready = True
+    return _openai_client
 
 def generate_summary(title, summary):
     """Generate a Telegram-optimized summary using AI"""
+    openai_client = get_openai_client()
     if not openai_client:
         logging.warning("OpenAI not configured - returning original summary")
         return summary or title
@@ -62,6 +73,7 @@ def generate_summary(title, summary):
 
 def analyze_content(title, summary):
     """Analyze content and provide categorization and sentiment"""
+    openai_client = get_openai_client()
     if not openai_client:
         return {
             'category': 'General',
@@ -126,6 +138,7 @@ def analyze_content(title, summary):
 
 def generate_hashtags(title, summary, category):
     """Generate relevant hashtags for the content"""
+    openai_client = get_openai_client()
     if not openai_client:
         return f"#{category.lower().replace(' ', '')}"
     
@@ -1,63 +1,32 @@
 import os
 import logging
+import click
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from database import init_db, get_db_connection
-from rss_parser import parse_feeds, get_rss_feeds, add_rss_feed, remove_rss_feed
+from database import init_db, get_db_connection, bump_items_revision, ensure_schema
+from rss_parser import parse_feeds, get_rss_feeds, add_rss_feed, remove_rss_feed, import_opml
 from ai_summary import generate_summary
 from telegram_bot import send_to_telegram
+from read_model import dashboard_items
+from static_export import export_categories, export_all
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-
-# Initialize database
-init_db()
-
-@app.route('/')
 def landing():
     """Official landing page showcasing the RSS curation system"""
     return render_template('landing.html')
 
-@app.route('/dashboard')
 def dashboard():
     """Main dashboard showing RSS items for review"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get all RSS items, ordered by date (newest first)
-        cursor.execute("""
-            SELECT id, title, summary, link, category, date, approved, ai_suggestion, feed_source
-            FROM rss_items 
-            ORDER BY date DESC, id DESC
-        """)
-        items = cursor.fetchall()
-        conn.close()
-        
-        # Convert to list of dicts for easier template handling
-        items_list = []
-        for item in items:
-            items_list.append({
-                'id': item[0],
-                'title': item[1],
-                'summary': item[2],
-                'link': item[3],
-                'category': item[4],
-                'date': item[5],
-                'approved': item[6],
-                'ai_suggestion': item[7],
-                'feed_source': item[8]
-            })
-        
-        return render_template('dashboard.html', items=items_list)
+        # Served from the in-process read model, newest first
+        items = dashboard_items.items()
+        return render_template('dashboard.html', items=items)
     except Exception as e:
         logging.error(f"Error in dashboard: {e}")
         flash(f"Error loading dashboard: {str(e)}", 'danger')
         return render_template('dashboard.html', items=[])
 
-@app.route('/generate_suggestion/<int:item_id>')
 def generate_suggestion(item_id):
     """Generate AI suggestion for a specific item"""
     try:
@@ -76,7 +45,7 @@ def generate_suggestion(item_id):
         
         # Update the item with the suggestion
         cursor.execute("""
-            UPDATE rss_items SET ai_suggestion = ? WHERE id = ?
+            UPDATE rss_items SET ai_suggestion = ?, ai_suggestion_stale = 0 WHERE id = ?
         """, (ai_text, item_id))
         conn.commit()
         conn.close()
@@ -86,7 +55,6 @@ def generate_suggestion(item_id):
         logging.error(f"Error generating suggestion: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/approve/<int:item_id>', methods=['POST'])
 def approve(item_id):
     """Approve an item and send to Telegram"""
     try:
@@ -95,7 +63,7 @@ def approve(item_id):
         
         # Get the item details
         cursor.execute("""
-            SELECT title, summary, link, ai_suggestion 
+            SELECT title, summary, link, ai_suggestion, ai_suggestion_stale, category
             FROM rss_items WHERE id = ?
         """, (item_id,))
         item = cursor.fetchone()
@@ -104,16 +72,22 @@ def approve(item_id):
             flash('Item not found', 'danger')
             return redirect(url_for('dashboard'))
         
-        # Use AI suggestion if available, otherwise original summary
-        content_to_send = item[3] if item[3] else item[1]
+        # Use AI suggestion if available and still matches the entry,
+        # otherwise original summary
+        content_to_send = item[3] if item[3] and not item[4] else item[1]
         
         # Send to Telegram
         success = send_to_telegram(item[0], content_to_send, item[2])
         
         if success:
             # Mark as approved
-            cursor.execute("UPDATE rss_items SET approved = 1 WHERE id = ?", (item_id,))
+            cursor.execute("""
+                UPDATE rss_items SET approved = 1, approved_at = CURRENT_TIMESTAMP WHERE id = ?
+            """, (item_id,))
+            revision = bump_items_revision(cursor)
             conn.commit()
+            dashboard_items.apply(revision, approved_ids=[item_id])
+            export_categories([item[5]])
             flash('Item approved and sent to Telegram!', 'success')
         else:
             flash('Failed to send to Telegram', 'danger')
@@ -125,15 +99,22 @@ def approve(item_id):
         flash(f'Error approving item: {str(e)}', 'danger')
         return redirect(url_for('dashboard'))
 
-@app.route('/reject/<int:item_id>', methods=['POST'])
 def reject(item_id):
     """Reject an item (delete it)"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.execute("SELECT approved, category FROM rss_items WHERE id = ?", (item_id,))
+        item = cursor.fetchone()
         cursor.execute("DELETE FROM rss_items WHERE id = ?", (item_id,))
+        revision = bump_items_revision(cursor)
         conn.commit()
         conn.close()
+        dashboard_items.apply(revision, removed_ids=[item_id])
+        
+        # Rejecting a previously approved item withdraws it from the feeds
+        if item and item['approved']:
+            export_categories([item['category']])
         flash('Item rejected and removed', 'info')
         return redirect(url_for('dashboard'))
     except Exception as e:
@@ -141,13 +122,11 @@ def reject(item_id):
         flash(f'Error rejecting item: {str(e)}', 'danger')
         return redirect(url_for('dashboard'))
 
-@app.route('/feeds')
 def manage_feeds():
     """RSS feed management page"""
     feeds = get_rss_feeds()
     return render_template('feed.html', feeds=feeds)
 
-@app.route('/add_feed', methods=['POST'])
 def add_feed():
     """Add a new RSS feed"""
     feed_url = request.form.get('feed_url', '').strip()
@@ -160,16 +139,32 @@ def add_feed():
     try:
         success = add_rss_feed(feed_url, feed_name)
         if success:
-            flash(f'Feed "{feed_name or feed_url}" added successfully!', 'success')
+            flash(f'Feed "{feed_name or feed_url}" added - validating in the background', 'success')
         else:
-            flash('Failed to add feed - please check the URL', 'danger')
+            flash('Failed to add feed - it may already exist', 'danger')
     except Exception as e:
         logging.error(f"Error adding feed: {e}")
         flash(f'Error adding feed: {str(e)}', 'danger')
     
     return redirect(url_for('manage_feeds'))
 
-@app.route('/remove_feed/<int:feed_id>', methods=['POST'])
+def import_feeds():
+    """Bulk-add feeds from an uploaded OPML file"""
+    opml_file = request.files.get('opml_file')
+    
+    if not opml_file:
+        flash('OPML file is required', 'danger')
+        return redirect(url_for('manage_feeds'))
+    
+    try:
+        added = import_opml(opml_file.read())
+        flash(f'Imported {added} feeds - validating in the background', 'success')
+    except Exception as e:
+        logging.error(f"Error importing OPML: {e}")
+        flash(f'Error importing feeds: {str(e)}', 'danger')
+    
+    return redirect(url_for('manage_feeds'))
+
 def remove_feed(feed_id):
     """Remove an RSS feed"""
     try:
@@ -184,7 +179,6 @@ def remove_feed(feed_id):
     
     return redirect(url_for('manage_feeds'))
 
-@app.route('/refresh_feeds', methods=['POST'])
 def refresh_feeds():
     """Manually refresh all RSS feeds"""
     try:
@@ -196,14 +190,74 @@ def refresh_feeds():
     
     return redirect(url_for('dashboard'))
 
-@app.errorhandler(404)
 def not_found_error(error):
     return render_template('dashboard.html', items=[]), 404
 
-@app.errorhandler(500)
 def internal_error(error):
     logging.error(f"Internal server error: {error}")
     return render_template('dashboard.html', items=[]), 500
 
+def create_app():
+    """Application factory.
+
+    Only builds the Flask app and registers routes; it does no database or
+    network work. The OpenAI client, feed parser and Telegram session are
+    set up lazily on first use.
+
+    The schema is created once per deployment, on the host that serves
+    requests: under gunicorn (Procfile) the master does it before forking
+    workers, see gunicorn.conf.py. Where there is no master process, such
+    as Vercel, the first request of each process applies it under a file
+    lock if it is missing or outdated.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+
+    app.add_url_rule('/', view_func=landing)
+    app.add_url_rule('/dashboard', view_func=dashboard)
+    app.add_url_rule('/generate_suggestion/<int:item_id>', view_func=generate_suggestion)
+    app.add_url_rule('/approve/<int:item_id>', view_func=approve, methods=['POST'])
+    app.add_url_rule('/reject/<int:item_id>', view_func=reject, methods=['POST'])
+    app.add_url_rule('/feeds', view_func=manage_feeds)
+    app.add_url_rule('/add_feed', view_func=add_feed, methods=['POST'])
+    app.add_url_rule('/import_feeds', view_func=import_feeds, methods=['POST'])
+    app.add_url_rule('/remove_feed/<int:feed_id>', view_func=remove_feed, methods=['POST'])
+    app.add_url_rule('/refresh_feeds', view_func=refresh_feeds, methods=['POST'])
+    app.register_error_handler(404, not_found_error)
+    app.register_error_handler(500, internal_error)
+
+    # Checked on the first request of each worker only; one PRAGMA read
+    # when the master already initialized the database
+    schema_ready = False
+
+    @app.before_request
+    def require_schema():
+        nonlocal schema_ready
+        if schema_ready or request.endpoint == 'static':
+            return None
+        try:
+            ensure_schema()
+        except Exception as e:
+            logging.error(f"Database schema could not be initialized: {e}")
+            return "Database is not initialized - please retry shortly.", 503
+        schema_ready = True
+        return None
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create the database schema and seed default feeds"""
+        init_db()
+
+    @app.cli.command("export-feeds")
+    def export_feeds_command():
+        """Rebuild the static RSS/JSON feeds of approved items"""
+        written = export_all()
+        click.echo(f"Wrote {written} feed files")
+
+    return app
+
+app = create_app()
+
 if __name__ == "__main__":
+    init_db()
     app.run(host="0.0.0.0", port=5000, debug=True)
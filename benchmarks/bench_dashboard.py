@@ -0,0 +1,143 @@
+"""Dashboard benchmark: per-request render cost and per-worker memory.
+
+Compares the previous per-request path (query every row, copy each into a
+dict, render full summaries) with the in-process read model. Run from the
+repository root:
+
+    python benchmarks/bench_dashboard.py [--items N] [--runs N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dashboard template as it was before the read model, for the baseline
+LEGACY_TEMPLATE = """{% extends "base.html" %}
+{% block content %}
+<ul class="feed-list">
+{% for item in items %}
+<li><h3>{{ item['title'] }}</h3><p>{{ item['summary'] }}</p>
+<a href="{{ item['link'] }}" target="_blank">Read more</a></li>
+{% endfor %}
+</ul>
+{% endblock %}
+"""
+
+
+def legacy_items(get_db_connection):
+    """The dashboard query and dict copy as it was before the read model"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, title, summary, link, category, date, approved, ai_suggestion, feed_source
+        FROM rss_items
+        ORDER BY date DESC, id DESC
+    """)
+    items = cursor.fetchall()
+    conn.close()
+    return [{
+        'id': item[0],
+        'title': item[1],
+        'summary': item[2],
+        'link': item[3],
+        'category': item[4],
+        'date': item[5],
+        'approved': item[6],
+        'ai_suggestion': item[7],
+        'feed_source': item[8],
+    } for item in items]
+
+
+def populate(count, summary_length):
+    from database import init_db, get_db_connection, bump_items_revision
+
+    init_db()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    words = ("lorem ipsum dolor sit amet " * (summary_length // 27 + 1))[:summary_length]
+    cursor.executemany("""
+        INSERT INTO rss_items (title, summary, link, category, date, feed_source, ai_suggestion)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(f"Item {i}", words, f"https://example.com/{i}", "Security",
+           f"2025-01-{i % 28 + 1:02d}", "Bench Feed", words[:280]) for i in range(count)])
+    bump_items_revision(cursor)
+    conn.commit()
+    conn.close()
+
+
+def time_ms(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def retained_kib(build):
+    """Memory held by the structure ``build`` returns"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del result
+    return size / 1024
+
+
+def run(args):
+    """Populate the benchmark database and print the measurements"""
+    sys.path.insert(0, REPO_ROOT)
+
+    import logging
+    from flask import render_template, render_template_string
+    from database import get_db_connection
+    from read_model import DashboardReadModel
+    import app as app_module
+
+    logging.disable(logging.CRITICAL)
+    populate(args.items, args.summary_length)
+    flask_app = app_module.app
+
+    with flask_app.test_request_context('/dashboard'):
+        legacy_build_ms = time_ms(lambda: legacy_items(get_db_connection), args.runs)
+        legacy_render_ms = time_ms(
+            lambda: render_template_string(LEGACY_TEMPLATE,
+                                           items=legacy_items(get_db_connection)),
+            args.runs)
+        legacy_kib = retained_kib(lambda: legacy_items(get_db_connection))
+
+        model = DashboardReadModel()
+        model_kib = retained_kib(lambda: (model.items(), model)[1])
+        model_build_ms = time_ms(model.items, args.runs)
+        model_render_ms = time_ms(
+            lambda: render_template('dashboard.html', items=model.items()), args.runs)
+
+    print(f"{args.items} items, {args.summary_length}-char summaries, "
+          f"median of {args.runs} requests")
+    print(f"{'':<14}{'items ms':>10}{'render ms':>11}{'memory KiB':>12}")
+    print(f"{'per-request':<14}{legacy_build_ms:>10.2f}{legacy_render_ms:>11.2f}{legacy_kib:>12.0f}")
+    print(f"{'read model':<14}{model_build_ms:>10.2f}{model_render_ms:>11.2f}{model_kib:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000, help="rows in rss_items")
+    parser.add_argument("--summary-length", type=int, default=2000,
+                        help="characters per summary")
+    parser.add_argument("--runs", type=int, default=50, help="requests per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["DATABASE_PATH"] = os.path.join(tmpdir, "bench.db")
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
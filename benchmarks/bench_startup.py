@@ -0,0 +1,77 @@
+"""Cold-start benchmark: import time of ``app`` and first-request latency.
+
+Each sample runs in a fresh interpreter so nothing is already imported or
+cached. Run from the repository root:
+
+    python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; prints import and first-request times in ms
+CHILD_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+client = app_module.app.test_client()
+response = client.get('/dashboard')
+t2 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(f"{(t1 - t0) * 1000:.3f} {(t2 - t1) * 1000:.3f}")
+"""
+
+
+def run_sample(database_path):
+    """Run one cold start and return (import_ms, first_request_ms)"""
+    env = dict(os.environ, DATABASE_PATH=database_path)
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_ms, request_ms = result.stdout.split()[-2:]
+    return float(import_ms), float(request_ms)
+
+
+def prepare_database(database_path):
+    """Create the schema once, as a deployment's release step would"""
+    env = dict(os.environ, DATABASE_PATH=database_path)
+    subprocess.run(
+        [sys.executable, "-c", "from database import init_db; init_db()"],
+        cwd=REPO_ROOT,
+        env=env,
+        check=True,
+    )
+
+
+def summarize(label, samples):
+    print(f"{label:<20} median {statistics.median(samples):8.2f} ms   "
+          f"min {min(samples):8.2f} ms   max {max(samples):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="number of cold starts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_path = os.path.join(tmpdir, "bench.db")
+        prepare_database(database_path)
+        samples = [run_sample(database_path) for _ in range(args.runs)]
+
+    summarize("import app", [s[0] for s in samples])
+    summarize("first /dashboard", [s[1] for s in samples])
+
+
+if __name__ == "__main__":
+    main()
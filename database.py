@@ -1,9 +1,9 @@
 import sqlite3
 import os
 import logging
-from models import get_schema
+from models import get_schema, get_migrations, SCHEMA_VERSION
 
-DATABASE_PATH = "database.db"
+DATABASE_PATH = os.environ.get("DATABASE_PATH", "database.db")
 
 def get_db_connection():
     """Get a database connection with proper configuration"""
@@ -11,16 +11,77 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row  # Enable column access by name
     return conn
 
+def bump_items_revision(cursor):
+    """Record a change to rss_items and return the new revision.
+
+    Must run inside the transaction that modifies rss_items so read models
+    in other workers can tell their copy is out of date.
+    """
+    cursor.execute("UPDATE app_meta SET value = value + 1 WHERE key = 'items_revision'")
+    cursor.execute("SELECT value FROM app_meta WHERE key = 'items_revision'")
+    return cursor.fetchone()[0]
+
+def get_items_revision(conn):
+    """Get the current rss_items revision"""
+    cursor = conn.execute("SELECT value FROM app_meta WHERE key = 'items_revision'")
+    return cursor.fetchone()[0]
+
+def schema_is_current():
+    """Check whether init_db() has been run for the current schema"""
+    conn = get_db_connection()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+    finally:
+        conn.close()
+
+def ensure_schema():
+    """Run init_db() unless the schema is already current.
+
+    A file lock next to the database serializes processes that start at
+    the same time, so the schema is still only applied once.
+    """
+    if schema_is_current():
+        return
+    
+    import fcntl
+
+    with open(DATABASE_PATH + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if not schema_is_current():
+                init_db()
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 def init_db():
-    """Initialize the database with required tables"""
+    """Initialize the database with required tables.
+
+    Meant to run once per deployment (in the gunicorn master, see
+    gunicorn.conf.py), not in every worker. Re-running it against an
+    up-to-date database is a no-op.
+    """
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            conn.close()
+            logging.info("Database schema already up to date")
+            return
+        
         # Execute schema creation
         for sql_command in get_schema():
             cursor.execute(sql_command)
         
+        # Tables created by an older schema keep their old columns
+        for sql_command in get_migrations():
+            try:
+                cursor.execute(sql_command)
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e):
+                    raise
+        
         # Add some default RSS feeds if none exist
         cursor.execute("SELECT COUNT(*) FROM rss_feeds")
         feed_count = cursor.fetchone()[0]
@@ -44,6 +105,7 @@ def init_db():
                     # Feed already exists, skip
                     pass
         
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
         conn.close()
         logging.info("Database initialized successfully")
@@ -63,11 +125,17 @@ def cleanup_old_items(days_old=30):
         """.format(days_old))
         
         deleted_count = cursor.rowcount
+        if deleted_count > 0:
+            bump_items_revision(cursor)
         conn.commit()
         conn.close()
         
         if deleted_count > 0:
             logging.info(f"Cleaned up {deleted_count} old items")
+            # Deleted items were approved, so drop them from the exported
+            # feeds; imported here because static_export imports this module
+            from static_export import export_all
+            export_all()
         
         return deleted_count
     except Exception as e:
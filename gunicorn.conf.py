@@ -0,0 +1,10 @@
+"""Gunicorn configuration.
+
+The database schema is applied once per deployment in the master process,
+before any worker is forked, on the host that serves requests.
+"""
+
+def on_starting(server):
+    from database import ensure_schema
+
+    ensure_schema()
@@ -1,5 +1,8 @@
 """Database models and schema definitions"""
 
+# Bump whenever get_schema() changes so init_db() re-applies it
+SCHEMA_VERSION = 6
+
 def get_schema():
     """Returns the database schema as SQL commands"""
     return [
@@ -9,6 +12,10 @@ def get_schema():
             url TEXT UNIQUE NOT NULL,
             name TEXT,
             active INTEGER DEFAULT 1,
+            status TEXT DEFAULT 'active',
+            etag TEXT,
+            last_modified TEXT,
+            validation_started_at TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """,
@@ -21,15 +28,42 @@ def get_schema():
             category TEXT DEFAULT 'General',
             date TEXT,
             approved INTEGER DEFAULT 0,
+            approved_at TIMESTAMP,
             ai_suggestion TEXT,
+            ai_suggestion_stale INTEGER DEFAULT 0,
             feed_source TEXT,
+            content_hash TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """,
         """
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        INSERT OR IGNORE INTO app_meta (key, value) VALUES ('items_revision', 0)
+        """,
+        """
         CREATE INDEX IF NOT EXISTS idx_rss_items_approved ON rss_items(approved)
         """,
         """
         CREATE INDEX IF NOT EXISTS idx_rss_items_date ON rss_items(date DESC)
         """
     ]
+
+def get_migrations():
+    """Returns commands that bring databases created by an older schema
+    up to date. Each must be safe to re-run or skip if already applied."""
+    return [
+        "ALTER TABLE rss_feeds ADD COLUMN status TEXT DEFAULT 'active'",
+        "ALTER TABLE rss_feeds ADD COLUMN etag TEXT",
+        "ALTER TABLE rss_feeds ADD COLUMN last_modified TEXT",
+        "ALTER TABLE rss_feeds ADD COLUMN validation_started_at TIMESTAMP",
+        "ALTER TABLE rss_items ADD COLUMN ai_suggestion_stale INTEGER DEFAULT 0",
+        "ALTER TABLE rss_items ADD COLUMN content_hash TEXT",
+        "ALTER TABLE rss_items ADD COLUMN approved_at TIMESTAMP",
+        "UPDATE rss_items SET approved_at = created_at WHERE approved = 1 AND approved_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS idx_rss_items_approved_at ON rss_items(approved, approved_at DESC)",
+    ]
@@ -0,0 +1,115 @@
+"""Compact in-process read model backing the dashboard.
+
+The dashboard used to query every row and copy it into a dict on each
+request. Instead each worker keeps one slotted record per item holding only
+the displayed fields, with summaries already cut down to a snippet. The
+ingest, approve and reject paths apply their changes to it directly.
+
+Changes made by other workers (or by cleanup) are detected through the
+``items_revision`` counter in ``app_meta``. Every writer bumps it inside its
+transaction. When the revision in the database is not the one the model
+last saw, the model reloads from the database.
+"""
+import logging
+import threading
+from database import get_db_connection, get_items_revision
+
+# Maximum number of summary characters kept for display
+SNIPPET_LENGTH = 300
+
+DASHBOARD_COLUMNS = "id, title, summary, link, category, date, approved, feed_source"
+
+def make_snippet(summary, length=SNIPPET_LENGTH):
+    """Truncate a summary at a word boundary for display"""
+    if not summary or len(summary) <= length:
+        return summary or ''
+    cut = summary[:length].rsplit(' ', 1)[0]
+    return cut.rstrip() + '…'
+
+class DashboardItem:
+    """A dashboard row holding only the fields the page displays"""
+    __slots__ = ('id', 'title', 'snippet', 'link', 'category', 'date',
+                 'approved', 'feed_source')
+
+    def __init__(self, id, title, summary, link, category, date, approved, feed_source):
+        self.id = id
+        self.title = title
+        self.snippet = make_snippet(summary)
+        self.link = link
+        self.category = category
+        self.date = date
+        self.approved = approved
+        self.feed_source = feed_source
+
+    @classmethod
+    def from_row(cls, row):
+        """Build an item from a row selected with DASHBOARD_COLUMNS"""
+        return cls(*row)
+
+    def sort_key(self):
+        # Mirrors ORDER BY date DESC, id DESC (NULL dates sort last)
+        return (self.date is not None, self.date or '', self.id)
+
+class DashboardReadModel:
+    """Per-worker cache of dashboard items kept current by write-through"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}
+        self._ordered = []
+        self._revision = None
+
+    def items(self):
+        """Return dashboard items ordered newest first"""
+        conn = get_db_connection()
+        try:
+            revision = get_items_revision(conn)
+            with self._lock:
+                if revision != self._revision:
+                    self._load(conn, revision)
+                if self._ordered is None:
+                    self._ordered = sorted(self._items.values(),
+                                           key=DashboardItem.sort_key, reverse=True)
+                return self._ordered
+        finally:
+            conn.close()
+
+    def _load(self, conn, revision):
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {DASHBOARD_COLUMNS}
+            FROM rss_items
+            ORDER BY date DESC, id DESC
+        """)
+        ordered = [DashboardItem.from_row(row) for row in cursor.fetchall()]
+        self._items = {item.id: item for item in ordered}
+        self._ordered = ordered
+        self._revision = revision
+        logging.debug(f"Loaded {len(ordered)} dashboard items at revision {revision}")
+
+    def apply(self, revision, upserts=(), approved_ids=(), removed_ids=()):
+        """Apply a committed change that produced ``revision``.
+
+        If the model missed an earlier revision, it is invalidated instead
+        and reloads on the next read.
+        """
+        with self._lock:
+            if self._revision is None or revision != self._revision + 1:
+                self._revision = None
+                return
+
+            for item in upserts:
+                self._items[item.id] = item
+            for item_id in approved_ids:
+                item = self._items.get(item_id)
+                if item is not None:
+                    item.approved = 1
+            for item_id in removed_ids:
+                self._items.pop(item_id, None)
+
+            # Approval leaves the order intact; anything else re-sorts lazily
+            if upserts or removed_ids:
+                self._ordered = None
+            self._revision = revision
+
+dashboard_items = DashboardReadModel()
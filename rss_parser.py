@@ -1,15 +1,54 @@
-import feedparser
+import time
 import sqlite3
 import logging
+import threading
 from datetime import datetime
-from database import get_db_connection
+from database import get_db_connection, bump_items_revision
+from read_model import DashboardItem, dashboard_items
+from static_export import export_categories
+
+# Seconds to wait for a feed server during a scheduled refresh
+FETCH_TIMEOUT = 30
+# Newly added feeds are validated with a much tighter timeout
+VALIDATION_TIMEOUT = 10
+# Number of feeds validated concurrently in the background
+VALIDATION_WORKERS = 4
+# A feed still 'validating' this long after its job was queued or started
+# is assumed lost (worker restarted or killed) and is validated again
+VALIDATION_STALE_AFTER = 2 * VALIDATION_TIMEOUT
+# Largest feed document accepted, in bytes
+MAX_FEED_BYTES = 10 * 1024 * 1024
+
+# Matches feeds whose validation job was lost; takes VALIDATION_STALE_AGE
+STALE_VALIDATION_SQL = """status = 'validating' AND (validation_started_at IS NULL
+                          OR validation_started_at < datetime('now', ?))"""
+VALIDATION_STALE_AGE = f"-{VALIDATION_STALE_AFTER} seconds"
+
+USER_AGENT = "GemFeed/1.0 (+https://github.com/support371/Gemfeed)"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """Return the background pool used to validate new feeds"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=VALIDATION_WORKERS,
+                                           thread_name_prefix="feed-validate")
+    return _executor
 
 def get_rss_feeds():
     """Get all active RSS feeds from database"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, url, name, active FROM rss_feeds WHERE active = 1")
+        cursor.execute(f"""
+            SELECT id, url, name, active, status, etag, last_modified,
+                   CASE WHEN {STALE_VALIDATION_SQL} THEN 1 ELSE 0 END AS validation_stale
+            FROM rss_feeds WHERE active = 1
+        """, (VALIDATION_STALE_AGE,))
         feeds = cursor.fetchall()
         conn.close()
         return feeds
@@ -17,32 +56,184 @@ def get_rss_feeds():
         logging.error(f"Error getting RSS feeds: {e}")
         return []
 
+def fetch_feed(url, etag=None, last_modified=None, timeout=FETCH_TIMEOUT):
+    """Download and parse a feed, sending any cached HTTP validators.
+
+    ``timeout`` bounds the whole download, not just each socket read, and
+    documents larger than MAX_FEED_BYTES are rejected. Returns
+    ``(feed, etag, last_modified)``. ``feed`` is None when the server
+    answered 304 Not Modified.
+    """
+    # feedparser and requests are imported lazily to keep app startup fast
+    import feedparser
+    import requests
+
+    headers = {'User-Agent': USER_AGENT}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    
+    deadline = time.monotonic() + timeout
+    with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304:
+            return None, etag, last_modified
+        response.raise_for_status()
+        
+        # Read against a wall-clock deadline so a server trickling bytes
+        # cannot hold the fetch past its timeout. read1() returns whatever
+        # has arrived instead of blocking until a full chunk (urllib3 2+)
+        read = getattr(response.raw, 'read1', None) or response.raw.read
+        chunks = []
+        size = 0
+        while True:
+            chunk = read(64 * 1024, decode_content=True)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_FEED_BYTES:
+                raise ValueError(f"Feed larger than {MAX_FEED_BYTES} bytes")
+            if time.monotonic() > deadline:
+                raise requests.Timeout(f"Feed download exceeded {timeout}s")
+            chunks.append(chunk)
+    
+    response_headers = {k.lower(): v for k, v in response.headers.items()}
+    feed = feedparser.parse(b''.join(chunks), response_headers=response_headers)
+    return (feed,
+            response.headers.get('ETag', etag),
+            response.headers.get('Last-Modified', last_modified))
+
 def add_rss_feed(url, name=None):
-    """Add a new RSS feed"""
+    """Add a new RSS feed and validate it in the background.
+
+    The feed is stored immediately with status 'validating'; the
+    background fetch either activates it and ingests its entries, marks it
+    'invalid', or leaves it 'retrying' after a transient network error.
+    Re-adding a feed that is 'invalid', 'retrying' or whose validation job
+    was lost queues it again.
+    """
     try:
-        # First validate the feed by trying to parse it
-        feed = feedparser.parse(url)
-        if feed.bozo and not feed.entries:
-            logging.warning(f"Invalid RSS feed: {url}")
-            return False
-        
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO rss_feeds (url, name) VALUES (?, ?)
-        """, (url, name or url))
+        try:
+            cursor.execute("""
+                INSERT INTO rss_feeds (url, name, status, validation_started_at)
+                VALUES (?, ?, 'validating', CURRENT_TIMESTAMP)
+            """, (url, name or url))
+            feed_id = cursor.lastrowid
+        except sqlite3.IntegrityError:
+            cursor.execute(f"""
+                UPDATE rss_feeds
+                SET status = 'validating', validation_started_at = CURRENT_TIMESTAMP,
+                    name = COALESCE(NULLIF(?, ''), name)
+                WHERE url = ? AND (status IN ('invalid', 'retrying') OR ({STALE_VALIDATION_SQL}))
+            """, (name, url, VALIDATION_STALE_AGE))
+            if cursor.rowcount == 0:
+                conn.close()
+                logging.warning(f"RSS feed already exists: {url}")
+                return False
+            cursor.execute("SELECT id, name FROM rss_feeds WHERE url = ?", (url,))
+            feed_id, name = cursor.fetchone()
         conn.commit()
         conn.close()
         
-        logging.info(f"Added RSS feed: {name or url}")
+        _get_executor().submit(validate_feed, feed_id, url, name or url)
+        logging.info(f"Queued RSS feed for validation: {name or url}")
         return True
-    except sqlite3.IntegrityError:
-        logging.warning(f"RSS feed already exists: {url}")
-        return False
     except Exception as e:
         logging.error(f"Error adding RSS feed {url}: {e}")
         return False
 
+def _is_transient_error(error):
+    """Whether a fetch failure is worth retrying later"""
+    import requests
+
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+def validate_feed(feed_id, url, feed_name, timeout=VALIDATION_TIMEOUT):
+    """Fetch a newly added feed and use the result as its first ingest.
+
+    Returns the resulting status and the titles of new items.
+    """
+    # Queued jobs can wait behind others; restart the staleness clock now
+    _set_feed_status(feed_id, 'validating')
+    try:
+        feed, etag, last_modified = fetch_feed(url, timeout=timeout)
+        
+        if feed is None or (feed.bozo and not feed.entries):
+            logging.warning(f"Invalid RSS feed: {url}")
+            _set_feed_status(feed_id, 'invalid')
+            return 'invalid', []
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        # Activate first: if the feed was removed meanwhile, store nothing
+        cursor.execute("""
+            UPDATE rss_feeds SET status = 'active', etag = ?, last_modified = ?
+            WHERE id = ?
+        """, (etag, last_modified, feed_id))
+        if cursor.rowcount == 0:
+            conn.close()
+            logging.info(f"RSS feed {feed_name} was removed during validation")
+            return 'removed', []
+        new_items, changed, previous_categories = store_entries(cursor, feed.entries, feed_name)
+        revision = bump_items_revision(cursor) if changed else None
+        conn.commit()
+        conn.close()
+        
+        if changed:
+            _publish_changes(revision, changed, previous_categories)
+        
+        logging.info(f"Validated RSS feed {feed_name}: {len(new_items)} new items")
+        return 'active', new_items
+    except Exception as e:
+        status = 'retrying' if _is_transient_error(e) else 'invalid'
+        logging.error(f"Error validating RSS feed {url} ({status}): {e}")
+        _set_feed_status(feed_id, status)
+        return status, []
+
+def _set_feed_status(feed_id, status):
+    """Record the validation state of a feed"""
+    try:
+        conn = get_db_connection()
+        conn.execute("""
+            UPDATE rss_feeds SET status = ?, validation_started_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (status, feed_id))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logging.error(f"Error updating status of RSS feed {feed_id}: {e}")
+
+def import_opml(opml_text):
+    """Queue every feed listed in an OPML document for validation.
+
+    Returns the number of feeds that were added.
+    """
+    import xml.etree.ElementTree as ET
+
+    try:
+        root = ET.fromstring(opml_text)
+    except ET.ParseError as e:
+        logging.warning(f"Invalid OPML document: {e}")
+        return 0
+    
+    added = 0
+    for outline in root.iter('outline'):
+        url = (outline.get('xmlUrl') or '').strip()
+        if not url:
+            continue
+        name = outline.get('title') or outline.get('text')
+        if add_rss_feed(url, name):
+            added += 1
+    
+    logging.info(f"Imported {added} feeds from OPML")
+    return added
+
 def remove_rss_feed(feed_id):
     """Remove an RSS feed"""
     try:
@@ -57,12 +248,130 @@ def remove_rss_feed(feed_id):
         logging.error(f"Error removing RSS feed {feed_id}: {e}")
         return False
 
-def parse_single_feed(url, feed_name):
+def compute_content_hash(title, summary, category, pub_date):
+    """Fingerprint the stored fields of an entry to detect publisher edits"""
+    import hashlib
+
+    payload = '\x1f'.join(str(value or '') for value in (title, summary, category, pub_date))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def store_entries(cursor, entries, feed_name):
+    """Upsert parsed feed entries.
+
+    Entries whose content hash is unchanged cause no writes. Edited entries
+    are updated in place and any cached AI suggestion is marked stale.
+    Returns the titles of new items, the dashboard records of every
+    inserted or updated item, and the previous categories of updated
+    approved items (their old category feeds must be re-exported too).
+    """
+    new_items = []
+    changed = []
+    previous_categories = []
+    updated = 0
+    for entry in entries:
+        try:
+            # Extract entry data
+            title = getattr(entry, 'title', 'No Title')
+            summary = getattr(entry, 'summary', getattr(entry, 'description', ''))
+            link = getattr(entry, 'link', '')
+            
+            # Try to get publication date
+            pub_date = ''
+            if hasattr(entry, 'published'):
+                pub_date = entry.published
+            elif hasattr(entry, 'updated'):
+                pub_date = entry.updated
+            
+            # Get category/tags
+            category = 'General'
+            if hasattr(entry, 'tags') and entry.tags:
+                category = entry.tags[0].term
+            elif hasattr(entry, 'category'):
+                category = entry.category
+            
+            # Clean up summary (remove HTML tags if present)
+            if summary:
+                import re
+                summary = re.sub('<[^<]+?>', '', summary)
+                summary = summary.strip()
+            
+            # Skip if essential fields are missing
+            if not title or not link:
+                continue
+            
+            content_hash = compute_content_hash(title, summary, category, pub_date)
+            cursor.execute("""
+                SELECT id, content_hash, approved, category, feed_source FROM rss_items WHERE link = ?
+            """, (link,))
+            existing = cursor.fetchone()
+            
+            if existing is None:
+                cursor.execute("""
+                    INSERT INTO rss_items (title, summary, link, category, date, feed_source, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (title, summary, link, category, pub_date, feed_name, content_hash))
+                
+                changed.append(DashboardItem(cursor.lastrowid, title, summary, link,
+                                             category, pub_date, 0, feed_name))
+                new_items.append(title)
+                logging.debug(f"Added item: {title}")
+            elif existing['content_hash'] == content_hash:
+                # Unchanged entry, nothing to write
+                continue
+            elif existing['content_hash'] is None:
+                # Stored before content hashes existed; record it without
+                # treating the entry as edited
+                cursor.execute("UPDATE rss_items SET content_hash = ? WHERE link = ?",
+                               (content_hash, link))
+            else:
+                cursor.execute("""
+                    UPDATE rss_items
+                    SET title = ?, summary = ?, category = ?, date = ?, content_hash = ?,
+                        ai_suggestion_stale = CASE WHEN ai_suggestion IS NULL THEN 0 ELSE 1 END
+                    WHERE link = ?
+                """, (title, summary, category, pub_date, content_hash, link))
+                
+                if existing['approved']:
+                    previous_categories.append(existing['category'])
+                # feed_source is not rewritten above, so mirror the stored one
+                changed.append(DashboardItem(existing['id'], title, summary, link, category,
+                                             pub_date, existing['approved'],
+                                             existing['feed_source']))
+                updated += 1
+                logging.debug(f"Updated item: {title}")
+            
+        except sqlite3.IntegrityError:
+            # Inserted concurrently by another ingest (duplicate link), skip
+            logging.debug(f"Skipping duplicate item: {getattr(entry, 'title', 'Unknown')}")
+            continue
+        except Exception as e:
+            logging.error(f"Error processing feed entry: {e}")
+            continue
+    
+    if updated:
+        logging.info(f"Updated {updated} edited items from {feed_name}")
+    return new_items, changed, previous_categories
+
+def _publish_changes(revision, changed, previous_categories):
+    """Push committed item changes to the dashboard and exported feeds"""
+    dashboard_items.apply(revision, upserts=changed)
+    # Edits to already approved items must reach the exported feeds, both
+    # under their new category and the one they may have moved out of
+    edited_categories = [item.category for item in changed if item.approved]
+    edited_categories += previous_categories
+    if edited_categories:
+        export_categories(edited_categories)
+
+def parse_single_feed(url, feed_name, etag=None, last_modified=None):
     """Parse a single RSS feed and return new items"""
     new_items = []
     try:
         logging.info(f"Parsing feed: {feed_name} ({url})")
-        feed = feedparser.parse(url)
+        feed, etag, last_modified = fetch_feed(url, etag, last_modified)
+        
+        if feed is None:
+            logging.debug(f"Feed not modified: {url}")
+            return new_items
         
         if feed.bozo and not feed.entries:
             logging.warning(f"Could not parse feed {url}: {feed.bozo_exception}")
@@ -70,58 +379,17 @@ def parse_single_feed(url, feed_name):
         
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        for entry in feed.entries:
-            try:
-                # Extract entry data
-                title = getattr(entry, 'title', 'No Title')
-                summary = getattr(entry, 'summary', getattr(entry, 'description', ''))
-                link = getattr(entry, 'link', '')
-                
-                # Try to get publication date
-                pub_date = ''
-                if hasattr(entry, 'published'):
-                    pub_date = entry.published
-                elif hasattr(entry, 'updated'):
-                    pub_date = entry.updated
-                
-                # Get category/tags
-                category = 'General'
-                if hasattr(entry, 'tags') and entry.tags:
-                    category = entry.tags[0].term
-                elif hasattr(entry, 'category'):
-                    category = entry.category
-                
-                # Clean up summary (remove HTML tags if present)
-                if summary:
-                    import re
-                    summary = re.sub('<[^<]+?>', '', summary)
-                    summary = summary.strip()
-                
-                # Skip if essential fields are missing
-                if not title or not link:
-                    continue
-                
-                # Try to insert the item
-                cursor.execute("""
-                    INSERT INTO rss_items (title, summary, link, category, date, feed_source)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (title, summary, link, category, pub_date, feed_name))
-                
-                new_items.append(title)
-                logging.debug(f"Added item: {title}")
-                
-            except sqlite3.IntegrityError:
-                # Item already exists (duplicate link), skip
-                logging.debug(f"Skipping duplicate item: {getattr(entry, 'title', 'Unknown')}")
-                continue
-            except Exception as e:
-                logging.error(f"Error processing feed entry: {e}")
-                continue
-        
+        new_items, changed, previous_categories = store_entries(cursor, feed.entries, feed_name)
+        revision = bump_items_revision(cursor) if changed else None
+        cursor.execute("""
+            UPDATE rss_feeds SET etag = ?, last_modified = ? WHERE url = ?
+        """, (etag, last_modified, url))
         conn.commit()
         conn.close()
         
+        if changed:
+            _publish_changes(revision, changed, previous_categories)
+        
         logging.info(f"Added {len(new_items)} new items from {feed_name}")
         return new_items
         
@@ -139,10 +407,19 @@ def parse_feeds():
         return total_new_items
     
     for feed in feeds:
-        feed_id, url, name, active = feed
-        if active:
-            new_items = parse_single_feed(url, name or url)
+        # Feeds that hit a transient error while validating, or whose
+        # validation job was lost, get another attempt with the normal timeout
+        if feed['status'] == 'retrying' or feed['validation_stale']:
+            status, new_items = validate_feed(feed['id'], feed['url'], feed['name'] or feed['url'],
+                                              timeout=FETCH_TIMEOUT)
             total_new_items += len(new_items)
+            continue
+        # Feeds still validating are ingested by their validation fetch
+        if feed['status'] != 'active':
+            continue
+        new_items = parse_single_feed(feed['url'], feed['name'] or feed['url'],
+                                      feed['etag'], feed['last_modified'])
+        total_new_items += len(new_items)
     
     logging.info(f"Total new items added: {total_new_items}")
     return total_new_items
@@ -0,0 +1,275 @@
+"""Static RSS 2.0 / JSON Feed export of approved items.
+
+Feeds are written under ``EXPORT_DIR`` (``static/feeds`` by default, which
+is gitignored):
+
+    all.xml, all.json                          newest approved items overall
+    category/<slug>-<hash>.xml, .json          the same per category
+    categories.json                            index of every category feed
+
+Approving, rejecting or updating an item only rewrites the site-wide feeds
+and the feeds of that item's category. A file is only replaced when its
+content actually changed, so unchanged feeds keep their mtime and ETag on
+the static host. Exports hold an exclusive lock on ``.export.lock`` in
+EXPORT_DIR from the query through the writes, so a slower export cannot
+overwrite a newer one from another worker.
+
+Configuration (environment):
+
+    EXPORT_BASE_URL        required; the absolute public URL EXPORT_DIR is
+                           served from, e.g. https://feeds.example.com/gemfeed.
+                           Feeds need absolute self links, so nothing is
+                           exported while it is unset.
+    EXPORT_PUBLISH_COMMAND optional; run (in the background, from EXPORT_DIR)
+                           after any file changed, to push the output to the
+                           static host, e.g. ``aws s3 sync . s3://bucket/gemfeed``
+                           or ``rsync -a ./ host:/srv/www/gemfeed/``.
+
+The app's database lives on the app server, so the output must be pushed
+from there: the GitHub Pages workflows and Vercel only deploy what is in
+git. Flask also serves ``static/feeds`` at ``/static/feeds/``, but that
+goes through the app and is only a fallback.
+"""
+import os
+import re
+import json
+import shlex
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime, format_datetime
+from datetime import datetime, timezone
+from database import get_db_connection
+
+EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join("static", "feeds"))
+# Public URL the export directory is served from, used for absolute links
+EXPORT_BASE_URL = os.environ.get("EXPORT_BASE_URL", "").rstrip("/")
+EXPORT_PUBLISH_COMMAND = os.environ.get("EXPORT_PUBLISH_COMMAND", "")
+# Seconds the publish command may run before it is killed
+PUBLISH_TIMEOUT = 300
+# Number of most recently approved items kept in each feed
+FEED_SIZE = 50
+
+FEED_TITLE = "GemFeed"
+FEED_DESCRIPTION = "Curated security news approved by the GemFeed editors"
+
+def category_slug(category):
+    """File-name-safe form of a category, unique per raw category.
+
+    The readable part alone collides ("C++" and "C" both give "c"), so a
+    short hash of the raw category is appended.
+    """
+    category = category or 'General'
+    readable = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-') or 'category'
+    digest = hashlib.sha1(category.encode('utf-8')).hexdigest()[:8]
+    return f"{readable}-{digest}"
+
+def _fetch_approved(cursor, category=None):
+    query = """
+        SELECT id, title, summary, link, category, date, ai_suggestion,
+               ai_suggestion_stale, approved_at
+        FROM rss_items
+        WHERE approved = 1 {}
+        ORDER BY approved_at DESC, id DESC
+        LIMIT ?
+    """
+    if category is None:
+        cursor.execute(query.format(""), (FEED_SIZE,))
+    else:
+        cursor.execute(query.format("AND category = ?"), (category, FEED_SIZE))
+    return cursor.fetchall()
+
+def _item_content(item):
+    # Same rule as the Telegram post: the AI text unless it went stale
+    if item['ai_suggestion'] and not item['ai_suggestion_stale']:
+        return item['ai_suggestion']
+    return item['summary'] or ''
+
+def _parse_date(value, sqlite_timestamp=False):
+    """Parse a feed date or SQLite CURRENT_TIMESTAMP into an aware datetime"""
+    if not value:
+        return None
+    try:
+        if sqlite_timestamp:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        parsed = parsedate_to_datetime(value)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+def _feed_url(path):
+    return f"{EXPORT_BASE_URL}/{path}"
+
+def render_rss(items, title, path):
+    """Render approved items as an RSS 2.0 document"""
+    rss = ET.Element('rss', version='2.0')
+    channel = ET.SubElement(rss, 'channel')
+    ET.SubElement(channel, 'title').text = title
+    ET.SubElement(channel, 'link').text = _feed_url(path)
+    ET.SubElement(channel, 'description').text = FEED_DESCRIPTION
+    if items:
+        # Derived from the data so unchanged feeds render identically
+        built = _parse_date(items[0]['approved_at'], sqlite_timestamp=True)
+        if built:
+            ET.SubElement(channel, 'lastBuildDate').text = format_datetime(built)
+
+    for item in items:
+        entry = ET.SubElement(channel, 'item')
+        ET.SubElement(entry, 'title').text = item['title']
+        ET.SubElement(entry, 'link').text = item['link']
+        ET.SubElement(entry, 'guid', isPermaLink='true').text = item['link']
+        ET.SubElement(entry, 'description').text = _item_content(item)
+        ET.SubElement(entry, 'category').text = item['category']
+        published = _parse_date(item['date'])
+        if published:
+            ET.SubElement(entry, 'pubDate').text = format_datetime(published)
+
+    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(rss, encoding='utf-8')
+
+def render_json_feed(items, title, path):
+    """Render approved items as a JSON Feed 1.1 document"""
+    feed_items = []
+    for item in items:
+        entry = {
+            'id': item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_text': _item_content(item),
+            'tags': [item['category']],
+        }
+        published = _parse_date(item['date'])
+        if published:
+            entry['date_published'] = published.isoformat()
+        feed_items.append(entry)
+
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': title,
+        'feed_url': _feed_url(path),
+        'description': FEED_DESCRIPTION,
+        'items': feed_items,
+    }
+    return json.dumps(feed, ensure_ascii=False, indent=2).encode('utf-8')
+
+def _write_if_changed(path, content):
+    """Atomically replace a file, skipping the write if it is unchanged"""
+    full_path = os.path.join(EXPORT_DIR, path)
+    try:
+        with open(full_path, 'rb') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(full_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, full_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+def render_category_index(categories):
+    """Render the index mapping each category to its feed URLs"""
+    def entry(title, base):
+        return {'title': title,
+                'rss': _feed_url(f"{base}.xml"),
+                'json': _feed_url(f"{base}.json")}
+
+    index = {
+        'all': entry(FEED_TITLE, 'all'),
+        'categories': {
+            category: entry(f"{FEED_TITLE} - {category}",
+                            f"category/{category_slug(category)}")
+            for category in sorted(categories)
+        },
+    }
+    return json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8')
+
+def _export_index(cursor):
+    """Rewrite categories.json; only touches the file when the set changed"""
+    cursor.execute("SELECT DISTINCT category FROM rss_items WHERE approved = 1")
+    categories = [row[0] or 'General' for row in cursor.fetchall()]
+    return int(_write_if_changed('categories.json', render_category_index(categories)))
+
+def _export_feed(cursor, category=None):
+    """Rewrite the XML and JSON files of one feed; returns files written"""
+    items = _fetch_approved(cursor, category)
+    if category is None:
+        title, base = FEED_TITLE, 'all'
+    else:
+        title, base = f"{FEED_TITLE} - {category}", f"category/{category_slug(category)}"
+
+    written = 0
+    written += _write_if_changed(f"{base}.xml", render_rss(items, title, f"{base}.xml"))
+    written += _write_if_changed(f"{base}.json", render_json_feed(items, title, f"{base}.json"))
+    return written
+
+def export_categories(categories):
+    """Rewrite the site-wide feeds and the feeds of the given categories.
+
+    Called after approved items change. Returns the number of files
+    written, or 0 on error or when EXPORT_BASE_URL is not configured.
+    """
+    if not EXPORT_BASE_URL:
+        logging.warning("EXPORT_BASE_URL not set - static feed export is disabled")
+        return 0
+
+    try:
+        import fcntl
+
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        with open(os.path.join(EXPORT_DIR, '.export.lock'), 'w') as lock_file:
+            # Held from the query through the writes: otherwise an export
+            # that read the database earlier could overwrite a newer one
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                conn = get_db_connection()
+                cursor = conn.cursor()
+                written = _export_feed(cursor)
+                for category in set(categories):
+                    written += _export_feed(cursor, category)
+                written += _export_index(cursor)
+                conn.close()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        logging.debug(f"Static export wrote {written} files")
+        if written and EXPORT_PUBLISH_COMMAND:
+            threading.Thread(target=publish_export, daemon=True).start()
+        return written
+    except Exception as e:
+        logging.error(f"Error exporting static feeds: {e}")
+        return 0
+
+def export_all():
+    """Rebuild every exported feed from scratch"""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT category FROM rss_items WHERE approved = 1")
+        categories = [row[0] for row in cursor.fetchall()]
+        conn.close()
+    except Exception as e:
+        logging.error(f"Error exporting static feeds: {e}")
+        return 0
+
+    return export_categories(categories)
+
+def publish_export():
+    """Run EXPORT_PUBLISH_COMMAND to push EXPORT_DIR to the static host"""
+    try:
+        subprocess.run(shlex.split(EXPORT_PUBLISH_COMMAND), cwd=EXPORT_DIR,
+                       check=True, timeout=PUBLISH_TIMEOUT)
+        logging.info("Published static feeds")
+        return True
+    except Exception as e:
+        logging.error(f"Error publishing static feeds: {e}")
+        return False
@@ -1,5 +1,4 @@
 import os
-import requests
 import logging
 from urllib.parse import quote
 
@@ -7,12 +6,26 @@ from urllib.parse import quote
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
+# HTTP session shared by all Telegram calls, created on first use so that
+# importing this module stays cheap and connections are reused afterwards
+_session = None
+
+def get_telegram_session():
+    """Return the shared requests session for the Telegram API"""
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+    return _session
+
 def send_to_telegram(title, content, link):
     """Send a message to Telegram channel/chat"""
     if not TELEGRAM_TOKEN or not CHAT_ID:
         logging.error("Telegram bot token or chat ID not configured")
         return False
     
+    import requests
+
     try:
         # Format the message with proper Telegram markdown
         message = f"*{title}*\n\n{content}\n\n[Read more →]({link})"
@@ -26,7 +39,7 @@ def send_to_telegram(title, content, link):
             "disable_web_page_preview": False
         }
         
-        response = requests.post(url, data=data, timeout=30)
+        response = get_telegram_session().post(url, data=data, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -54,7 +67,7 @@ def test_telegram_connection():
     
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getMe"
-        response = requests.get(url, timeout=10)
+        response = get_telegram_session().get(url, timeout=10)
         
         if response.status_code == 200:
             result = response.json()
@@ -79,7 +92,7 @@ def get_chat_info():
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getChat"
         data = {"chat_id": CHAT_ID}
         
-        response = requests.post(url, data=data, timeout=10)
+        response = get_telegram_session().post(url, data=data, timeout=10)
         
         if response.status_code == 200:
             result = response.json()